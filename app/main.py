@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, HTTPException, Query
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,6 +10,7 @@ import json
 import asyncio
 from app.services.ai_service import convert_nl_to_sql_with_feedback
 from app.services.sql_service import execute_sql_query
+from app.services import analytics_service, stats_service
 from fastapi.responses import StreamingResponse
 
 
@@ -42,6 +43,28 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def start_analytics_sync():
+    # The mirror loads in a background thread; queries stay on MySQL until it is ready.
+    # No-op unless ANALYTICS_ENGINE=duckdb
+    analytics_service.start_sync()
+
+
+@app.on_event("startup")
+async def start_stats_flush():
+    stats_service.start_flush()
+
+
+@app.on_event("shutdown")
+async def stop_analytics_sync():
+    analytics_service.stop_sync()
+
+
+@app.on_event("shutdown")
+async def stop_stats_flush():
+    stats_service.stop_flush()
+
+
 @app.get("/")
 async def read_root(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
@@ -57,7 +80,7 @@ async def process_query(request: QueryRequest):
             raise Exception(f"Failed to generate SQL: {result['error']}")
         
         # Execute SQL query and get results
-        results = execute_sql_query(result["sql"])
+        results = execute_sql_query(result["sql"], question=request.query)
         
         return {
             "original_query": request.query,
@@ -80,6 +103,12 @@ async def process_feedback(feedback_data: dict):
     return {"status": "received"}
 
 
+@app.get("/api/stats/queries")
+async def query_stats(limit: int = Query(50, ge=1, le=1000)):
+    # Executed SQL grouped by fingerprint and executor, most expensive (total time) first
+    return {"queries": stats_service.get_query_stats(limit)}
+
+
 @app.post("/api/convert-query")
 async def convert_query(request: QueryRequest):
     async def generate():
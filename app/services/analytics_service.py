@@ -0,0 +1,509 @@
+from app.database import get_db_connection
+from typing import List, Dict, Any, Optional, Tuple
+import os
+import re
+import threading
+import time
+
+# DuckDB (with pyarrow for bulk loads) is optional; without it every query keeps running on MySQL
+try:
+    import duckdb
+    import pyarrow
+except ImportError:
+    duckdb = None
+
+# Tables mirrored into the in-process store and their primary keys.
+# MySQL stays the source of truth: new rows are appended by primary key
+# between syncs and every table is rebuilt from scratch periodically.
+MIRRORED_TABLES = {
+    "products": "product_id",
+    "customers": "customer_id",
+    "sales": "sale_id",
+}
+
+# Text columns compare case- and accent-insensitively like MySQL's default `_ci` collations
+TABLE_DDL = {
+    "products": """
+        CREATE TABLE {name} (
+            product_id INTEGER PRIMARY KEY,
+            product_name VARCHAR COLLATE NOCASE.NOACCENT,
+            category VARCHAR COLLATE NOCASE.NOACCENT,
+            price DECIMAL(10, 2)
+        )
+    """,
+    "customers": """
+        CREATE TABLE {name} (
+            customer_id INTEGER PRIMARY KEY,
+            customer_name VARCHAR COLLATE NOCASE.NOACCENT,
+            gender VARCHAR COLLATE NOCASE.NOACCENT,
+            age INTEGER,
+            city VARCHAR COLLATE NOCASE.NOACCENT,
+            join_date DATE
+        )
+    """,
+    "sales": """
+        CREATE TABLE {name} (
+            sale_id INTEGER PRIMARY KEY,
+            product_id INTEGER,
+            customer_id INTEGER,
+            quantity_sold INTEGER,
+            sale_amount DECIMAL(10, 2),
+            sale_date DATE,
+            region VARCHAR COLLATE NOCASE.NOACCENT
+        )
+    """,
+}
+
+# Column names of the mirrored tables, as DuckDB reports them
+MIRRORED_COLUMNS = {
+    "product_id", "product_name", "category", "price",
+    "customer_id", "customer_name", "gender", "age", "city", "join_date",
+    "sale_id", "quantity_sold", "sale_amount", "sale_date", "region",
+}
+
+# Statements and clauses that must never leave MySQL
+WRITE_KEYWORDS = {
+    "insert", "update", "delete", "replace", "create", "alter", "drop", "truncate", "grant",
+    "revoke", "lock", "call", "set", "load", "into", "outfile", "for", "handler", "do",
+}
+# Keywords DuckDB accepts but evaluates differently from MySQL: pattern matching
+# ignores column collations, DIV and INTERVAL arithmetic change result types,
+# USING/NATURAL joins order `*` columns differently and CURRENT_* use another clock
+NON_PORTABLE_KEYWORDS = {
+    "like", "regexp", "rlike", "sounds", "escape", "div", "mod", "xor", "interval", "binary",
+    "collate", "using", "natural", "straight_join", "rollup", "use", "force", "ignore",
+    "current_date", "current_time", "current_timestamp", "localtime", "localtimestamp",
+    "utc_date", "utc_time", "utc_timestamp",
+}
+# Functions that return the same values (and types after JSON encoding) on
+# both engines. Anything else, e.g. DAYOFWEEK (0- vs 1-based), CONCAT (NULL handling),
+# AVG (DOUBLE vs DECIMAL) or DuckDB's own table functions, stays on MySQL.
+PORTABLE_FUNCTIONS = {
+    "count", "sum", "min", "max", "year", "month", "day", "quarter", "coalesce", "ifnull",
+    "abs", "upper", "lower", "row_number", "rank", "dense_rank", "lag", "lead",
+}
+# Keywords that may directly precede a parenthesis without being a function call
+PAREN_KEYWORDS = {
+    "in", "over", "and", "or", "not", "exists", "as", "from", "join", "on", "when", "then",
+    "else", "where", "by", "select", "having", "all", "any", "some", "case", "between",
+    "union", "with", "distinct", "is",
+}
+# Keywords that end a table reference instead of naming its alias
+CLAUSE_KEYWORDS = {
+    "join", "inner", "left", "right", "full", "outer", "cross", "on", "where", "group",
+    "having", "order", "limit", "union", "window", "as",
+}
+# Keywords that can end an expression, so they are never an implicit alias
+EXPRESSION_KEYWORDS = {
+    "and", "or", "not", "is", "in", "between", "case", "when", "then", "else", "end", "null",
+    "true", "false", "distinct", "all", "any", "some", "exists", "asc", "desc", "as",
+}
+ALLOWED_OPERATORS = {"(", ")", ",", ".", ";", "*", "=", "<", ">", "<=", ">=", "<>", "!=", "+", "-"}
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<string>'(?:[^'\\]|\\.|'')*')
+  | (?P<ident>`[^`]*`|[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)
+  | (?P<op><=>|<=|>=|<>|!=|\|\||&&|[^\sA-Za-z0-9_'`])
+  | (?P<space>\s+)
+""", re.VERBOSE)
+
+_conn = None
+_lock = threading.Lock()
+_sync_lock = threading.Lock()
+_last_keys: Dict[str, Any] = {}
+_last_sync: Optional[float] = None
+_last_full_sync: Optional[float] = None
+_sync_thread: Optional[threading.Thread] = None
+_stop_event = threading.Event()
+
+
+def is_enabled() -> bool:
+    """Return True when the DuckDB executor is configured and available"""
+    return duckdb is not None and os.getenv("ANALYTICS_ENGINE", "mysql").lower() == "duckdb"
+
+
+def _get_sync_interval() -> int:
+    return int(os.getenv("ANALYTICS_SYNC_INTERVAL", "300"))
+
+
+def _get_full_reload_interval() -> int:
+    return int(os.getenv("ANALYTICS_FULL_RELOAD_INTERVAL", "3600"))
+
+
+def _tokenize(sql_query: str) -> Optional[List[Tuple[str, str]]]:
+    """Split a query into (kind, text) tokens, or None if it uses literals DuckDB reads differently.
+
+    Double-quoted strings become identifiers in DuckDB and backslash escapes are
+    not interpreted, so queries containing either are left to MySQL.
+    """
+    tokens = []
+    position = 0
+    while position < len(sql_query):
+        match = TOKEN_PATTERN.match(sql_query, position)
+        if match is None:
+            return None
+        kind, text = match.lastgroup, match.group()
+        position = match.end()
+        if kind == "space":
+            continue
+        if kind == "string" and "\\" in text:
+            return None
+        if kind == "op" and text not in ALLOWED_OPERATORS:
+            return None
+        tokens.append((kind, text))
+    return tokens
+
+
+def _word(token: Tuple[str, str]) -> Optional[str]:
+    """Lower-cased keyword or bare identifier; None for quoted identifiers and other tokens"""
+    kind, text = token
+    return text.lower() if kind == "ident" and not text.startswith("`") else None
+
+
+def _identifier_name(token: Tuple[str, str]) -> str:
+    return token[1].strip("`")
+
+
+def _tables_are_mirrored(tokens: List[Tuple[str, str]]) -> bool:
+    """Check that every FROM/JOIN source is a mirrored table, a CTE or a subquery"""
+    # CTEs are declared as `name AS (`
+    cte_names = {
+        _identifier_name(tokens[i]).lower() for i in range(len(tokens) - 2)
+        if tokens[i][0] == "ident" and _word(tokens[i + 1]) == "as" and tokens[i + 2][1] == "("
+    }
+
+    i = 0
+    while i < len(tokens):
+        if _word(tokens[i]) not in ("from", "join"):
+            i += 1
+            continue
+        # Walk a comma-separated list of table references
+        while True:
+            i += 1
+            if i >= len(tokens):
+                return False
+            if tokens[i][1] == "(":
+                # Derived tables are checked when the scan reaches their own FROM
+                break
+            if tokens[i][0] != "ident":
+                return False
+            name = _identifier_name(tokens[i]).lower()
+            if i + 1 < len(tokens) and tokens[i + 1][1] in (".", "("):
+                # Schema-qualified names (information_schema.columns) and table functions
+                return False
+            if name not in MIRRORED_TABLES and name not in cte_names:
+                return False
+            i += 1
+            if i < len(tokens) and _word(tokens[i]) == "as":
+                i += 1
+            if i < len(tokens) and tokens[i][0] == "ident" and _word(tokens[i]) not in CLAUSE_KEYWORDS:
+                i += 1
+            if i >= len(tokens) or tokens[i][1] != ",":
+                break
+    return True
+
+
+def _select_items(tokens: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+    """Split the outermost SELECT list into its expressions"""
+    depth = 0
+    start = None
+    for i, token in enumerate(tokens):
+        if token[1] == "(":
+            depth += 1
+        elif token[1] == ")":
+            depth -= 1
+        elif depth == 0 and _word(token) == "select":
+            start = i + 1
+            break
+    if start is None:
+        return []
+
+    items, current, depth = [], [], 0
+    for token in tokens[start:]:
+        if token[1] == "(":
+            depth += 1
+        elif token[1] == ")":
+            depth -= 1
+        if depth == 0 and (_word(token) in ("from", "where", "group", "order", "limit", "union") or token[1] == ";"):
+            break
+        if depth == 0 and token[1] == ",":
+            items.append(current)
+            current = []
+        else:
+            current.append(token)
+    items.append(current)
+
+    if items[0] and _word(items[0][0]) in ("distinct", "all"):
+        items[0] = items[0][1:]
+    return items
+
+
+def _defined_aliases(tokens: List[Tuple[str, str]]) -> set:
+    """Names introduced with `AS name` anywhere in the query, in the case they were written"""
+    return {
+        _identifier_name(tokens[i + 1]) for i in range(len(tokens) - 1)
+        if _word(tokens[i]) == "as" and tokens[i + 1][0] == "ident"
+        and (i + 2 >= len(tokens) or tokens[i + 2][1] != "(")
+    }
+
+
+def _result_name_is_portable(item: List[Tuple[str, str]], aliases: set) -> bool:
+    """Check that DuckDB names this select expression exactly like MySQL does.
+
+    MySQL names an unaliased expression after its text (`COUNT(*)`) and a column
+    after the case it was typed in, while DuckDB uses its own rendering
+    (`count_star()`) and the stored column name. Only aliases, `*`, lower-case
+    mirrored column names and references to aliases spelled as they were
+    defined give the same result keys.
+    """
+    texts = [token[1] for token in item]
+    if texts == ["*"] or (len(texts) == 3 and texts[1:] == [".", "*"]):
+        return True
+    if len(texts) in (1, 3) and (len(texts) == 1 or texts[1] == "."):
+        name = _identifier_name(item[-1])
+        return item[-1][0] == "ident" and (name in MIRRORED_COLUMNS or name in aliases)
+    if len(item) < 2 or item[-1][0] != "ident" or _word(item[-1]) in EXPRESSION_KEYWORDS:
+        return False
+    previous = item[-2]
+    if _word(previous) == "as":
+        return True
+    # Implicit alias: `SUM(x) total`, but not `price + age` or `a AND b`
+    return previous[1] == ")" or previous[0] in ("string", "number") or (
+        previous[0] == "ident" and _word(previous) not in EXPRESSION_KEYWORDS
+    )
+
+
+def is_analytical_query(sql_query: str) -> bool:
+    """Check whether a query is read-only, analytical and returns the same rows on DuckDB"""
+    tokens = _tokenize(sql_query)
+    if not tokens or _word(tokens[0]) not in ("select", "with"):
+        return False
+    if any(token[1] == ";" for token in tokens[:-1]):
+        # Multiple statements never leave MySQL
+        return False
+
+    words = [_word(token) for token in tokens]
+    if any(word in WRITE_KEYWORDS or word in NON_PORTABLE_KEYWORDS for word in words):
+        return False
+
+    for i, token in enumerate(tokens[:-1]):
+        if token[0] == "ident" and tokens[i + 1][1] == "(":
+            if words[i] in PAREN_KEYWORDS:
+                continue
+            # Any call outside the allowlist (including quoted names) is not portable
+            if _word(token) not in PORTABLE_FUNCTIONS:
+                return False
+            # DuckDB's aggregate DISTINCT ignores column collations: COUNT(DISTINCT city)
+            # counts 'Pune' and 'pune' twice where MySQL counts them once
+            if i + 2 < len(tokens) and words[i + 2] == "distinct":
+                return False
+
+    if not _tables_are_mirrored(tokens):
+        return False
+    aliases = _defined_aliases(tokens)
+    if not all(_result_name_is_portable(item, aliases) for item in _select_items(tokens)):
+        return False
+
+    return (
+        "join" in words
+        or any(words[i] == "group" and words[i + 1] == "by" for i in range(len(words) - 1))
+        or any(words[i] == "over" and tokens[i + 1][1] == "(" for i in range(len(tokens) - 1))
+    )
+
+
+def should_route(sql_query: str) -> bool:
+    """Decide whether a query should run on the in-process analytics store"""
+    return is_enabled() and _last_sync is not None and is_analytical_query(sql_query)
+
+
+def _to_duckdb_dialect(sql_query: str) -> str:
+    """Rewrite the MySQL-only bits of generated SQL that DuckDB does not accept"""
+    if _tokenize(sql_query) is None:
+        raise Exception("Query uses string literals that DuckDB reads differently than MySQL")
+    # Backtick-quoted identifiers become standard double-quoted ones
+    rewritten = TOKEN_PATTERN.sub(
+        lambda match: f'"{match.group()[1:-1]}"' if match.group().startswith("`") else match.group(),
+        sql_query
+    )
+    return rewritten.rstrip().rstrip(";").rstrip()
+
+
+def _get_duckdb_connection():
+    global _conn
+    with _lock:
+        if _conn is None:
+            conn = duckdb.connect(os.getenv("ANALYTICS_DB_PATH", ":memory:"))
+            # MySQL sorts NULL first in ascending and last in descending order
+            conn.execute("SET GLOBAL default_null_order = 'nulls_first_on_asc_last_on_desc'")
+            _conn = conn
+    return _conn
+
+
+def _fetch_rows(cursor, table: str, key: str, after: Any = None) -> Tuple[List[str], List[tuple]]:
+    """Read rows from MySQL, optionally only those with a primary key greater than `after`"""
+    if after is None:
+        cursor.execute(f"SELECT * FROM {table} ORDER BY {key}")
+    else:
+        cursor.execute(f"SELECT * FROM {table} WHERE {key} > %s ORDER BY {key}", (after,))
+    columns = [column[0] for column in cursor.description]
+    return columns, cursor.fetchall()
+
+
+def _insert_rows(writer, table: str, columns: List[str], rows: List[tuple]):
+    """Bulk-load rows through an Arrow table instead of one INSERT per row"""
+    if rows:
+        batch = pyarrow.table({column: [row[i] for row in rows] for i, column in enumerate(columns)})
+        column_list = ", ".join(columns)
+        writer.register("incoming_rows", batch)
+        try:
+            writer.execute(f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM incoming_rows")
+        finally:
+            writer.unregister("incoming_rows")
+
+
+def _reload_table(cursor, writer, table: str, key: str) -> int:
+    """Rebuild one mirrored table from a full MySQL read and swap it in atomically"""
+    columns, rows = _fetch_rows(cursor, table, key)
+    staging = f"{table}__staging"
+
+    writer.execute(f"DROP TABLE IF EXISTS {staging}")
+    writer.execute(TABLE_DDL[table].format(name=staging))
+    writer.execute("BEGIN TRANSACTION")
+    try:
+        _insert_rows(writer, staging, columns, rows)
+        writer.execute(f"DROP TABLE IF EXISTS {table}")
+        writer.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+        writer.execute("COMMIT")
+    except Exception:
+        writer.execute("ROLLBACK")
+        raise
+
+    _last_keys[table] = rows[-1][columns.index(key)] if rows else None
+    return len(rows)
+
+
+def _append_new_rows(cursor, writer, table: str, key: str) -> int:
+    """Append rows added to MySQL since the last sync"""
+    columns, rows = _fetch_rows(cursor, table, key, _last_keys.get(table))
+    if rows:
+        writer.execute("BEGIN TRANSACTION")
+        try:
+            _insert_rows(writer, table, columns, rows)
+            writer.execute("COMMIT")
+        except Exception:
+            writer.execute("ROLLBACK")
+            raise
+        _last_keys[table] = rows[-1][columns.index(key)]
+    return len(rows)
+
+
+def sync_tables(full: bool = False) -> Dict[str, int]:
+    """Copy MySQL changes into the DuckDB mirror.
+
+    The first sync after startup, and every ANALYTICS_FULL_RELOAD_INTERVAL
+    seconds after that, rebuilds each table so updated and deleted rows are
+    picked up. In between only new rows are appended, and a table is rebuilt
+    early when its row count no longer matches MySQL. Returns the number of
+    rows loaded per table.
+    """
+    global _last_sync, _last_full_sync
+    if duckdb is None:
+        raise Exception("DuckDB is not installed; run `pip install duckdb pyarrow` to enable the analytics engine")
+
+    loaded = {}
+    # Syncs are serialized; readers never wait on this lock and keep querying the last committed copy
+    with _sync_lock:
+        full = full or _last_full_sync is None or time.time() - _last_full_sync >= _get_full_reload_interval()
+
+        mysql_conn = get_db_connection()
+        cursor = mysql_conn.cursor()
+        writer = _get_duckdb_connection().cursor()
+        try:
+            for table, key in MIRRORED_TABLES.items():
+                if full:
+                    loaded[table] = _reload_table(cursor, writer, table, key)
+                    continue
+
+                loaded[table] = _append_new_rows(cursor, writer, table, key)
+
+                # Deleted rows leave the counts apart; rebuild instead of serving them
+                cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                mysql_count = cursor.fetchone()[0]
+                mirror_count = writer.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                if mysql_count != mirror_count:
+                    loaded[table] = _reload_table(cursor, writer, table, key)
+
+            if full:
+                _last_full_sync = time.time()
+            _last_sync = time.time()
+        finally:
+            writer.close()
+            cursor.close()
+            mysql_conn.close()
+
+    return loaded
+
+
+def execute_analytical_query(sql_query: str) -> List[Dict[str, Any]]:
+    """Execute an already sanitized read-only query on the DuckDB mirror"""
+    if duckdb is None:
+        raise Exception("DuckDB is not installed; run `pip install duckdb pyarrow` to enable the analytics engine")
+
+    # Each cursor is its own connection to the shared database, so readers need no lock
+    cursor = _get_duckdb_connection().cursor()
+    try:
+        cursor.execute(_to_duckdb_dialect(sql_query))
+        columns = [column[0] for column in cursor.description]
+        rows = cursor.fetchall()
+    except duckdb.Error as e:
+        raise Exception(f"Analytics execution error: {str(e)}")
+    finally:
+        cursor.close()
+
+    processed_results = []
+    for row in rows:
+        processed_row = {}
+        for key, value in zip(columns, row):
+            if isinstance(value, (bytes, memoryview)):
+                processed_row[key] = str(value)
+            else:
+                processed_row[key] = value
+        processed_results.append(processed_row)
+
+    return processed_results
+
+
+def _sync_loop():
+    # The initial full load runs here so startup is not blocked; until it
+    # succeeds `should_route` keeps every query on MySQL
+    try:
+        sync_tables(full=True)
+    except Exception as e:
+        print("Initial analytics sync failed:", str(e))
+
+    while not _stop_event.wait(_get_sync_interval()):
+        try:
+            sync_tables()
+        except Exception as e:
+            print("Analytics sync failed:", str(e))
+
+
+def start_sync():
+    """Start the background thread that loads and periodically syncs the mirror"""
+    global _sync_thread
+    if not is_enabled() or _sync_thread is not None:
+        return
+
+    _stop_event.clear()
+    _sync_thread = threading.Thread(target=_sync_loop, name="analytics-sync", daemon=True)
+    _sync_thread.start()
+
+
+def stop_sync():
+    """Stop the periodic sync thread"""
+    global _sync_thread
+    _stop_event.set()
+    if _sync_thread is not None:
+        _sync_thread.join(timeout=5)
+        _sync_thread = None
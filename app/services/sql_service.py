@@ -1,7 +1,9 @@
 from app.database import get_db_connection
+from app.services import analytics_service, stats_service
 import mysql.connector
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import re
+import time
 
 def sanitize_sql_query(sql_query: str) -> str:
     """Remove any markdown formatting or code blocks from the SQL query"""
@@ -19,12 +21,37 @@ def sanitize_sql_query(sql_query: str) -> str:
     
     return sql_query
 
-def execute_sql_query(sql_query: str) -> List[Dict[str, Any]]:
+def execute_sql_query(sql_query: str, question: Optional[str] = None) -> List[Dict[str, Any]]:
     """Execute SQL query and return results as a list of dictionaries"""
+    # Sanitize the SQL query
+    sanitized_query = sanitize_sql_query(sql_query)
+    
+    # Read-only analytical queries go to the columnar mirror when it is enabled
+    fallback = False
+    if analytics_service.should_route(sanitized_query):
+        try:
+            start = time.perf_counter()
+            results = analytics_service.execute_analytical_query(sanitized_query)
+            # Aggregate timings per query fingerprint and executor for /api/stats/queries
+            duration_ms = (time.perf_counter() - start) * 1000
+            stats_service.record_query(sanitized_query, duration_ms, results, question, executor="duckdb")
+            return results
+        except Exception as e:
+            # Dialect gaps (e.g. MySQL-only functions) fall back to MySQL, the source of truth
+            print("Analytics engine failed, falling back to MySQL:", str(e))
+            fallback = True
+    
+    # The failed DuckDB attempt is not part of the MySQL timing
+    start = time.perf_counter()
+    results = execute_mysql_query(sanitized_query)
+    duration_ms = (time.perf_counter() - start) * 1000
+    stats_service.record_query(sanitized_query, duration_ms, results, question, executor="mysql", fallback=fallback)
+    
+    return results
+
+def execute_mysql_query(sanitized_query: str) -> List[Dict[str, Any]]:
+    """Execute an already sanitized SQL query directly on MySQL"""
     try:
-        # Sanitize the SQL query
-        sanitized_query = sanitize_sql_query(sql_query)
-        
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         
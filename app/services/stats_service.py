@@ -0,0 +1,266 @@
+from typing import List, Dict, Any, Optional
+from collections import deque
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+
+# Number of recent execution times kept per entry for the p95
+MAX_TIMING_SAMPLES = 200
+# Number of those samples written to disk on each flush
+MAX_FLUSHED_SAMPLES = 50
+# Number of distinct originating questions kept per entry, and their length
+MAX_QUESTIONS = 10
+MAX_QUESTION_LENGTH = 300
+# Share of entries dropped at once when the store is full
+EVICTION_FRACTION = 0.05
+# Numeric fields every loaded entry must have
+REQUIRED_FIELDS = ("calls", "total_time_ms", "min_time_ms", "max_time_ms", "rows", "bytes_serialized", "first_seen")
+
+STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+NUMERIC_LITERAL = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b', re.IGNORECASE)
+VALUE_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+
+_lock = threading.Lock()
+_stats: Dict[str, Dict[str, Any]] = {}
+_flush_thread: Optional[threading.Thread] = None
+_stop_event = threading.Event()
+
+
+def _get_stats_path() -> str:
+    return os.getenv("QUERY_STATS_PATH", "query_stats.json")
+
+
+def _get_flush_interval() -> int:
+    return int(os.getenv("QUERY_STATS_FLUSH_INTERVAL", "60"))
+
+
+def _get_max_entries() -> int:
+    return int(os.getenv("QUERY_STATS_MAX_ENTRIES", "5000"))
+
+
+def normalize_sql(sql_query: str) -> str:
+    """Canonicalize a query: literals become `?`, whitespace is collapsed and casing lowered"""
+    normalized = STRING_LITERAL.sub("?", sql_query)
+    normalized = NUMERIC_LITERAL.sub("?", normalized)
+    # IN lists of any length share one fingerprint
+    normalized = VALUE_LIST.sub("(?)", normalized)
+    normalized = re.sub(r'\s+', ' ', normalized).strip().rstrip(";").strip()
+    normalized = re.sub(r'\s*,\s*', ', ', normalized)
+    normalized = re.sub(r'\(\s+', '(', normalized)
+    normalized = re.sub(r'\s+\)', ')', normalized)
+    normalized = re.sub(r'\s*(<=|>=|<>|!=|=|<|>)\s*', r' \1 ', normalized)
+    return normalized.lower()
+
+
+def fingerprint_sql(sql_query: str) -> str:
+    """Return a short stable identifier for the normalized form of a query"""
+    return hashlib.md5(normalize_sql(sql_query).encode()).hexdigest()[:16]
+
+
+def _percentile(values, percentile: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    # Nearest-rank: the smallest value with at least `percentile`% of samples at or below it
+    index = max(0, math.ceil(percentile / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def _estimate_size(rows: List[Dict[str, Any]]) -> int:
+    """Approximate the serialized size of a result set without serializing it again"""
+    return sum(len(str(key)) + len(str(value)) for row in rows for key, value in row.items())
+
+
+def _evict_entries():
+    """Drop the least-called, then least recently seen entries; caller holds `_lock`"""
+    evict_count = max(1, int(_get_max_entries() * EVICTION_FRACTION), len(_stats) - _get_max_entries() + 1)
+    victims = sorted(_stats, key=lambda key: (_stats[key]["calls"], _stats[key].get("last_seen") or 0))
+    for key in victims[:evict_count]:
+        del _stats[key]
+
+
+def record_query(sql_query: str, duration_ms: float, rows: List[Dict[str, Any]], question: Optional[str] = None,
+                 executor: str = "mysql", fallback: bool = False):
+    """Add one successful execution to the aggregates of its fingerprint and executor.
+
+    `fallback` marks a MySQL execution that ran because the DuckDB attempt failed.
+    """
+    query_id = fingerprint_sql(sql_query)
+    # Rough size of the rows as they will be sent back in the API response
+    bytes_serialized = _estimate_size(rows)
+
+    with _lock:
+        stats_key = f"{query_id}:{executor}"
+        entry = _stats.get(stats_key)
+        if entry is None:
+            if len(_stats) >= _get_max_entries():
+                _evict_entries()
+            entry = _stats[stats_key] = {
+                "query_id": query_id,
+                "executor": executor,
+                "query": normalize_sql(sql_query),
+                "calls": 0,
+                "total_time_ms": 0.0,
+                "min_time_ms": duration_ms,
+                "max_time_ms": duration_ms,
+                "rows": 0,
+                "bytes_serialized": 0,
+                "fallbacks": 0,
+                "timings": deque(maxlen=MAX_TIMING_SAMPLES),
+                "questions": [],
+                "first_seen": time.time(),
+            }
+        entry["calls"] += 1
+        entry["total_time_ms"] += duration_ms
+        entry["min_time_ms"] = min(entry["min_time_ms"], duration_ms)
+        entry["max_time_ms"] = max(entry["max_time_ms"], duration_ms)
+        entry["rows"] += len(rows)
+        entry["bytes_serialized"] += bytes_serialized
+        entry["fallbacks"] += int(fallback)
+        entry["timings"].append(duration_ms)
+        entry["last_seen"] = time.time()
+        question = question[:MAX_QUESTION_LENGTH] if question else None
+        if question and question not in entry["questions"]:
+            entry["questions"].append(question)
+            del entry["questions"][:-MAX_QUESTIONS]
+
+
+def get_query_stats(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Return per-fingerprint and executor statistics sorted by total execution time"""
+    with _lock:
+        snapshot = [(dict(entry), list(entry["timings"])) for entry in _stats.values()]
+
+    results = []
+    for entry, timings in snapshot:
+        results.append({
+            "query_id": entry["query_id"],
+            "executor": entry["executor"],
+            "query": entry["query"],
+            "calls": entry["calls"],
+            "total_time_ms": round(entry["total_time_ms"], 3),
+            "mean_time_ms": round(entry["total_time_ms"] / entry["calls"], 3),
+            "p95_time_ms": round(_percentile(timings, 95), 3),
+            "min_time_ms": round(entry["min_time_ms"], 3),
+            "max_time_ms": round(entry["max_time_ms"], 3),
+            "rows": entry["rows"],
+            "mean_rows": round(entry["rows"] / entry["calls"], 1),
+            "bytes_serialized": entry["bytes_serialized"],
+            "fallbacks": entry["fallbacks"],
+            "questions": list(entry["questions"]),
+            "first_seen": entry["first_seen"],
+            "last_seen": entry.get("last_seen"),
+        })
+
+    results.sort(key=lambda item: item["total_time_ms"], reverse=True)
+    return results[:limit] if limit is not None else results
+
+
+def flush_stats():
+    """Write the current statistics to disk, replacing the previous snapshot"""
+    path = _get_stats_path()
+    with _lock:
+        data = {}
+        for stats_key, entry in _stats.items():
+            # Only the most recent samples are persisted to keep the file small
+            timings = list(entry["timings"])[-MAX_FLUSHED_SAMPLES:]
+            data[stats_key] = dict(entry, timings=timings, questions=list(entry["questions"]))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _migrate_entry(stats_key: str, entry: Any) -> Optional[Dict[str, Any]]:
+    """Validate one flushed entry, upgrading files written before stats were kept per executor.
+
+    Returns None for entries that cannot be used.
+    """
+    if not isinstance(entry, dict) or not isinstance(entry.get("query"), str):
+        return None
+    for field in REQUIRED_FIELDS:
+        if not isinstance(entry.get(field), (int, float)) or isinstance(entry.get(field), bool):
+            return None
+    if entry["calls"] < 1:
+        return None
+
+    # Older files keyed entries by fingerprint alone and only ran on MySQL
+    entry.setdefault("query_id", stats_key.split(":")[0])
+    entry.setdefault("executor", "mysql")
+    entry.setdefault("fallbacks", 0)
+    if not isinstance(entry["query_id"], str) or not isinstance(entry["executor"], str):
+        return None
+    if not isinstance(entry["fallbacks"], int):
+        return None
+    timings = entry.get("timings")
+    questions = entry.get("questions")
+    entry["timings"] = deque(
+        [value for value in timings if isinstance(value, (int, float))] if isinstance(timings, list) else [],
+        maxlen=MAX_TIMING_SAMPLES
+    )
+    entry["questions"] = [q for q in questions if isinstance(q, str)][-MAX_QUESTIONS:] if isinstance(questions, list) else []
+    return entry
+
+
+def load_stats():
+    """Restore statistics flushed by a previous run, if any"""
+    path = _get_stats_path()
+    if not os.path.exists(path):
+        return
+
+    with open(path) as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        print("Ignoring query stats file with unexpected format:", path)
+        return
+
+    with _lock:
+        for stats_key, entry in data.items():
+            entry = _migrate_entry(stats_key, entry)
+            if entry is None:
+                print("Dropping invalid query stats entry:", stats_key)
+                continue
+            _stats[f"{entry['query_id']}:{entry['executor']}"] = entry
+        if len(_stats) > _get_max_entries():
+            _evict_entries()
+
+
+def _flush_loop():
+    while not _stop_event.wait(_get_flush_interval()):
+        try:
+            flush_stats()
+        except Exception as e:
+            print("Query stats flush failed:", str(e))
+
+
+def start_flush():
+    """Load previously flushed statistics and start the periodic flush thread"""
+    global _flush_thread
+    if _flush_thread is not None:
+        return
+
+    try:
+        load_stats()
+    except Exception as e:
+        print("Loading query stats failed:", str(e))
+
+    _stop_event.clear()
+    _flush_thread = threading.Thread(target=_flush_loop, name="query-stats-flush", daemon=True)
+    _flush_thread.start()
+
+
+def stop_flush():
+    """Stop the flush thread and write a final snapshot"""
+    global _flush_thread
+    _stop_event.set()
+    if _flush_thread is not None:
+        _flush_thread.join(timeout=5)
+        _flush_thread = None
+    try:
+        flush_stats()
+    except Exception as e:
+        print("Query stats flush failed:", str(e))
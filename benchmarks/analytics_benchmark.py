@@ -0,0 +1,179 @@
+"""Compare direct MySQL execution with the DuckDB analytics engine.
+
+Usage:
+    python -m benchmarks.analytics_benchmark --scale 100 --repeat 5
+
+`--scale N` grows the `sales` table to N copies of the 300 sample rows
+(`sample_data_all_quoted.sql`) by inserting shifted `sale_id`s into MySQL.
+It is idempotent, but it does write to the configured database, so only
+point it at a scratch copy of the sample schema.
+"""
+from dotenv import load_dotenv
+
+# Database settings are read at import time
+load_dotenv()
+
+import argparse
+import decimal
+import re
+import statistics
+import time
+
+from app.database import get_db_connection
+from app.services import analytics_service
+from app.services.sql_service import execute_mysql_query
+
+SAMPLE_SALES_ROWS = 300
+
+BENCHMARK_QUERIES = {
+    "running_total_by_customer": """
+        SELECT c.customer_name, s.sale_date, s.sale_amount,
+               SUM(s.sale_amount) OVER (PARTITION BY c.customer_id ORDER BY s.sale_date, s.sale_id) AS running_total
+        FROM sales s
+        JOIN customers c ON s.customer_id = c.customer_id
+        ORDER BY c.customer_name, s.sale_date, s.sale_id
+    """,
+    "category_rank_by_region": """
+        SELECT s.region, p.category, s.sale_id, s.sale_amount,
+               DENSE_RANK() OVER (PARTITION BY s.region, p.category ORDER BY s.sale_amount DESC) AS amount_rank
+        FROM sales s
+        JOIN products p ON s.product_id = p.product_id
+        WHERE p.category IN ('electronics', 'furniture')
+    """,
+    "product_rank_by_city": """
+        SELECT c.city, p.product_name, SUM(s.sale_amount) AS total_sales,
+               RANK() OVER (PARTITION BY c.city ORDER BY SUM(s.sale_amount) DESC) AS city_rank
+        FROM sales s
+        JOIN customers c ON s.customer_id = c.customer_id
+        JOIN products p ON s.product_id = p.product_id
+        GROUP BY c.city, p.product_name
+    """,
+    "monthly_sales_by_gender": """
+        SELECT YEAR(s.sale_date) AS sale_year, MONTH(s.sale_date) AS sale_month, c.gender,
+               SUM(s.sale_amount) AS total_sales, SUM(s.quantity_sold) AS total_quantity
+        FROM sales s
+        JOIN customers c ON s.customer_id = c.customer_id
+        GROUP BY YEAR(s.sale_date), MONTH(s.sale_date), c.gender
+        ORDER BY sale_year, sale_month, c.gender
+    """,
+    "customers_by_city": """
+        SELECT c.city, COUNT(*) AS sales_count, MIN(c.customer_name) AS first_customer
+        FROM sales s
+        JOIN customers c ON s.customer_id = c.customer_id
+        GROUP BY c.city
+        ORDER BY c.city
+    """,
+    # DuckDB answers these differently (result keys, 0-based DAYOFWEEK, CONCAT
+    # with NULL), so the router must keep them on MySQL
+    "unaliased_aggregates": """
+        SELECT s.region, COUNT(*), SUM(s.sale_amount), COUNT(DISTINCT s.customer_id)
+        FROM sales s
+        JOIN products p ON s.product_id = p.product_id
+        GROUP BY s.region
+    """,
+    "sales_by_weekday": """
+        SELECT DAYOFWEEK(s.sale_date) AS weekday, SUM(s.sale_amount) AS total_sales
+        FROM sales s
+        JOIN products p ON s.product_id = p.product_id
+        GROUP BY DAYOFWEEK(s.sale_date)
+        ORDER BY weekday
+    """,
+    "customer_labels": """
+        SELECT CONCAT(c.customer_name, ' (', c.city, ')') AS label, COUNT(*) AS sales_count
+        FROM sales s
+        JOIN customers c ON s.customer_id = c.customer_id
+        GROUP BY c.customer_name, c.city
+    """,
+}
+
+
+def scale_sales(scale: int):
+    """Insert shifted copies of the sample sales rows until there are `scale` copies"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        for copy in range(1, scale):
+            cursor.execute(
+                """
+                INSERT IGNORE INTO sales
+                    (sale_id, product_id, customer_id, quantity_sold, sale_amount, sale_date, region)
+                SELECT sale_id + %s, product_id, customer_id, quantity_sold, sale_amount, sale_date, region
+                FROM sales
+                WHERE sale_id <= %s
+                """,
+                (copy * SAMPLE_SALES_ROWS, SAMPLE_SALES_ROWS)
+            )
+        conn.commit()
+        cursor.execute("SELECT COUNT(*) FROM sales")
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _normalize_rows(rows, ordered: bool):
+    """Comparable form of a result set; numbers compare by value whatever their type.
+
+    Row order only counts when the query sorts its result.
+    """
+    normalized = []
+    for row in rows:
+        normalized.append(tuple(
+            (key, round(float(value), 6) if isinstance(value, (int, float, decimal.Decimal)) else value)
+            for key, value in row.items()
+        ))
+    return normalized if ordered else sorted(normalized, key=repr)
+
+
+def _has_order_by(sql_query: str) -> bool:
+    # A top-level ORDER BY follows the last closing parenthesis; window ORDER BYs sit inside OVER (...)
+    return re.search(r'\border\s+by\b', sql_query[sql_query.rfind(")") + 1:], re.IGNORECASE) is not None
+
+
+def time_query(execute, sql_query: str, repeat: int):
+    """Return the median wall time in milliseconds and the rows of the last run"""
+    timings = []
+    rows = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = execute(sql_query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MySQL against the DuckDB analytics engine")
+    parser.add_argument("--scale", type=int, default=1, help="copies of the sample sales rows to load into MySQL")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query; the median is reported")
+    args = parser.parse_args()
+
+    if analytics_service.duckdb is None:
+        raise SystemExit("DuckDB is not installed; run `pip install duckdb pyarrow` first")
+
+    if args.scale > 1:
+        print(f"sales rows after scaling: {scale_sales(args.scale)}")
+
+    start = time.perf_counter()
+    loaded = analytics_service.sync_tables()
+    print(f"initial sync: {loaded} in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    mismatches = []
+    print(f"{'query':<28}{'rows':>8}{'mysql ms':>12}{'duckdb ms':>12}{'speedup':>10}")
+    for name, sql_query in BENCHMARK_QUERIES.items():
+        mysql_ms, mysql_rows = time_query(execute_mysql_query, sql_query, args.repeat)
+        if not analytics_service.is_analytical_query(sql_query):
+            print(f"{name:<28}{len(mysql_rows):>8}{mysql_ms:>12.1f}{'mysql only':>12}")
+            continue
+        duckdb_ms, duckdb_rows = time_query(analytics_service.execute_analytical_query, sql_query, args.repeat)
+        # Any routed query must give the same answer, or the timings mean nothing
+        ordered = _has_order_by(sql_query)
+        if _normalize_rows(mysql_rows, ordered) != _normalize_rows(duckdb_rows, ordered):
+            mismatches.append(name)
+        print(f"{name:<28}{len(mysql_rows):>8}{mysql_ms:>12.1f}{duckdb_ms:>12.1f}{mysql_ms / duckdb_ms:>9.1f}x")
+
+    if mismatches:
+        raise SystemExit(f"DuckDB results differ from MySQL for: {', '.join(mismatches)}")
+
+
+if __name__ == "__main__":
+    main()
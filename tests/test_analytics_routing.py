@@ -0,0 +1,83 @@
+import pytest
+
+from app.services import analytics_service
+
+
+ROUTED_QUERIES = [
+    "SELECT c.city, SUM(s.sale_amount) AS total FROM sales s JOIN customers c ON s.customer_id = c.customer_id GROUP BY c.city ORDER BY total DESC;",
+    "SELECT city, COUNT(*) n FROM customers GROUP BY city",
+    "SELECT sale_id, RANK() OVER (PARTITION BY region ORDER BY sale_amount DESC) AS `Rank` FROM sales",
+    "SELECT s.*, p.category FROM sales s JOIN products p ON s.product_id = p.product_id WHERE p.category = 'Electronics'",
+    "SELECT DISTINCT p.category FROM products p JOIN sales s ON s.product_id = p.product_id",
+    "SELECT c.customer_name FROM customers c, sales s WHERE c.customer_id = s.customer_id GROUP BY c.customer_name",
+    "SELECT region, COUNT(*) AS n FROM sales WHERE region IN ('It''s', 'South') GROUP BY region",
+    "WITH t AS (SELECT customer_id, SUM(sale_amount) AS total FROM sales GROUP BY customer_id) "
+    "SELECT c.customer_name, t.total FROM t JOIN customers c ON c.customer_id = t.customer_id",
+    "SELECT x.region, x.total FROM (SELECT region, SUM(sale_amount) AS total FROM sales GROUP BY region) x "
+    "JOIN sales s ON s.region = x.region",
+]
+
+# (query, reason it must stay on MySQL)
+MYSQL_ONLY_QUERIES = [
+    ("SELECT * FROM sales", "not analytical"),
+    ("UPDATE sales SET region = 'x'", "write"),
+    ("SELECT region FROM sales GROUP BY region; DELETE FROM sales", "multiple statements"),
+    ("SELECT region FROM sales GROUP BY region FOR UPDATE", "locking read"),
+    ("SELECT region, COUNT(*) AS n INTO OUTFILE '/tmp/x' FROM sales GROUP BY region", "file write"),
+    ("SELECT region FROM sales WHERE region LIKE 'south' GROUP BY region", "LIKE ignores collation"),
+    ("SELECT region, AVG(sale_amount) AS a FROM sales GROUP BY region", "AVG returns DOUBLE"),
+    ("SELECT sale_amount / 2 AS h FROM sales GROUP BY sale_amount", "division"),
+    ("SELECT DAYOFWEEK(sale_date) AS d FROM sales s JOIN products p ON 1 = 1", "function not allowlisted"),
+    ("SELECT CONCAT(city, NULL) AS c FROM customers GROUP BY city", "function not allowlisted"),
+    ("SELECT region, COUNT(DISTINCT customer_id) AS n FROM sales GROUP BY region", "aggregate DISTINCT"),
+    ("SELECT region, SUM(sale_amount) AS t FROM sales GROUP BY region WITH ROLLUP", "ROLLUP"),
+    ("SELECT region FROM sales s JOIN customers c USING (customer_id) GROUP BY region", "USING join"),
+    ("SELECT COUNT(*) FROM sales GROUP BY region", "unaliased expression"),
+    ("SELECT region, SUM(sale_amount) FROM sales GROUP BY region", "unaliased expression"),
+    ("SELECT price + age FROM products JOIN customers ON 1 = 1", "unaliased expression"),
+    ("SELECT REGION, COUNT(*) AS n FROM sales GROUP BY region", "column in another case"),
+    ("SELECT table_name, COUNT(*) AS n FROM information_schema.columns GROUP BY table_name", "qualified table"),
+    ("SELECT name, COUNT(*) AS n FROM duckdb_tables() GROUP BY name", "table function"),
+    ("SELECT region, COUNT(*) AS n FROM orders GROUP BY region", "table not mirrored"),
+    ("SELECT region, COUNT(*) AS n FROM sales s JOIN returns r ON 1 = 1 GROUP BY region", "table not mirrored"),
+    ('SELECT region, COUNT(*) AS n FROM sales WHERE region = "South" GROUP BY region', "double-quoted string"),
+    ("SELECT region, COUNT(*) AS n FROM sales WHERE region = 'a\\'b' GROUP BY region", "backslash escape"),
+    ("SELECT region, COUNT(*) AS n FROM sales WHERE region = 'x' || 'y' GROUP BY region", "MySQL || is OR"),
+]
+
+
+@pytest.mark.parametrize("sql_query", ROUTED_QUERIES)
+def test_portable_analytical_queries_are_routed(sql_query):
+    assert analytics_service.is_analytical_query(sql_query)
+
+
+@pytest.mark.parametrize("sql_query, reason", MYSQL_ONLY_QUERIES)
+def test_other_queries_stay_on_mysql(sql_query, reason):
+    assert not analytics_service.is_analytical_query(sql_query), reason
+
+
+@pytest.mark.parametrize("sql_query, keyword", [
+    ("SELECT region FROM sales WHERE region = 'DELETE FROM sales' GROUP BY region", "delete"),
+    ("SELECT region FROM sales WHERE region = 'a;b' GROUP BY region", ";"),
+    ("SELECT region FROM sales WHERE region = 'AVG(x) / 2' GROUP BY region", "avg"),
+])
+def test_keywords_inside_string_literals_are_ignored(sql_query, keyword):
+    assert analytics_service.is_analytical_query(sql_query), keyword
+
+
+@pytest.mark.parametrize("sql_query, expected", [
+    ("SELECT `sale_id` AS `Sale Id` FROM sales;", 'SELECT "sale_id" AS "Sale Id" FROM sales'),
+    ("SELECT region FROM sales WHERE region = 'a`b'", "SELECT region FROM sales WHERE region = 'a`b'"),
+    ("SELECT region\n  FROM sales ;  ", "SELECT region\n  FROM sales"),
+])
+def test_to_duckdb_dialect(sql_query, expected):
+    assert analytics_service._to_duckdb_dialect(sql_query) == expected
+
+
+@pytest.mark.parametrize("sql_query", [
+    'SELECT region FROM sales WHERE region = "South"',
+    "SELECT region FROM sales WHERE region = 'a\\\\b'",
+])
+def test_to_duckdb_dialect_rejects_literals_read_differently(sql_query):
+    with pytest.raises(Exception):
+        analytics_service._to_duckdb_dialect(sql_query)
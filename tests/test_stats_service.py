@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from app.services import stats_service
+
+
+@pytest.fixture(autouse=True)
+def isolated_stats(tmp_path, monkeypatch):
+    monkeypatch.setenv("QUERY_STATS_PATH", str(tmp_path / "query_stats.json"))
+    stats_service._stats.clear()
+    yield tmp_path / "query_stats.json"
+    stats_service._stats.clear()
+
+
+@pytest.mark.parametrize("values, percentile, expected", [
+    (list(range(1, 31)), 95, 29),
+    (list(range(1, 21)), 95, 19),
+    (list(range(1, 101)), 95, 95),
+    ([7], 95, 7),
+    ([], 95, 0.0),
+])
+def test_percentile_is_nearest_rank(values, percentile, expected):
+    assert stats_service._percentile(values, percentile) == expected
+
+
+@pytest.mark.parametrize("first, second", [
+    ("SELECT * FROM sales WHERE region = 'North' LIMIT 10",
+     "select *  from sales\n where region='South' limit 5;"),
+    ("SELECT * FROM sales WHERE sale_id IN (1, 2, 3)",
+     "SELECT * FROM sales WHERE sale_id IN ( 7 )"),
+])
+def test_fingerprint_ignores_literals_whitespace_and_case(first, second):
+    assert stats_service.fingerprint_sql(first) == stats_service.fingerprint_sql(second)
+
+
+def test_record_and_reload_round_trip(isolated_stats):
+    stats_service.record_query("SELECT 1 FROM sales", 5.0, [{"a": 1}], "q", executor="duckdb")
+    stats_service.record_query("SELECT 1 FROM sales", 9.0, [{"a": 1}], "q", executor="mysql", fallback=True)
+    stats_service.flush_stats()
+    stats_service._stats.clear()
+
+    stats_service.load_stats()
+
+    results = {entry["executor"]: entry for entry in stats_service.get_query_stats()}
+    assert results["duckdb"]["calls"] == 1
+    assert results["mysql"]["fallbacks"] == 1
+    assert results["mysql"]["query_id"] == results["duckdb"]["query_id"]
+
+
+def test_load_migrates_entries_without_executor(isolated_stats):
+    # Format written before statistics were kept per executor
+    isolated_stats.write_text(json.dumps({
+        "1cfbd0bddd890e2f": {
+            "query": "select ? from sales", "calls": 2, "total_time_ms": 4.0, "min_time_ms": 1.0,
+            "max_time_ms": 3.0, "rows": 2, "bytes_serialized": 10, "timings": [1.0, 3.0],
+            "questions": ["q"], "first_seen": 1.0, "last_seen": 2.0,
+        },
+    }))
+
+    stats_service.load_stats()
+
+    [entry] = stats_service.get_query_stats()
+    assert entry["query_id"] == "1cfbd0bddd890e2f"
+    assert entry["executor"] == "mysql"
+    assert entry["fallbacks"] == 0
+    assert entry["p95_time_ms"] == 3.0
+
+
+@pytest.mark.parametrize("entry", [
+    "not an entry",
+    {"query": "select ?", "calls": 1},
+    {"query": "select ?", "calls": "1", "total_time_ms": 1.0, "min_time_ms": 1.0, "max_time_ms": 1.0,
+     "rows": 0, "bytes_serialized": 0, "first_seen": 1.0},
+    {"query": "select ?", "calls": 0, "total_time_ms": 1.0, "min_time_ms": 1.0, "max_time_ms": 1.0,
+     "rows": 0, "bytes_serialized": 0, "first_seen": 1.0},
+    {"query": "select ?", "calls": 1, "total_time_ms": 1.0, "min_time_ms": 1.0, "max_time_ms": 1.0,
+     "rows": 0, "bytes_serialized": 0, "first_seen": 1.0, "executor": None},
+])
+def test_load_skips_invalid_entries(isolated_stats, entry):
+    isolated_stats.write_text(json.dumps({"bad": entry}))
+
+    stats_service.load_stats()
+
+    assert stats_service.get_query_stats() == []
+
+
+def test_store_is_capped(monkeypatch):
+    monkeypatch.setenv("QUERY_STATS_MAX_ENTRIES", "20")
+    for _ in range(3):
+        stats_service.record_query("SELECT region FROM sales", 1.0, [])
+    for i in range(100):
+        stats_service.record_query(f"SELECT c{i} FROM sales", 1.0, [])
+
+    assert len(stats_service._stats) <= 20
+    assert any(entry["calls"] == 3 for entry in stats_service.get_query_stats())